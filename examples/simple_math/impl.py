@@ -5,10 +5,102 @@ This module demonstrates how to write Python functions that can be tested
 via the transpilation testing infrastructure.
 """
 
+import math
 import sys
+from functools import lru_cache
 sys.path.append('../../python')
+
+import numpy as np
+
 from server import transpile_test
 
+# Witness set making Miller-Rabin deterministic for all n < 3.317e24,
+# which comfortably covers the int64 range
+_MR_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+# Below this bound trial division has the lower constant factor
+_TRIAL_DIVISION_LIMIT = 1_000_000
+
+
+def _miller_rabin(n):
+    """Miller-Rabin primality test with a fixed witness set.
+
+    O(log^3 n) versus O(sqrt(n)) for trial division; deterministic for
+    n < 3.317e24 with the witnesses above (probabilistic beyond that).
+    Assumes n is odd and greater than 3.
+    """
+    d = n - 1
+    r = 0
+    while d % 2 == 0:
+        d >>= 1
+        r += 1
+
+    for a in _MR_WITNESSES:
+        if a % n == 0:
+            continue
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _is_prime(n):
+    """Primality test: vectorized trial division for small n, Miller-Rabin
+    for large n."""
+    if n < 2:
+        return False
+    if n < 4:
+        return True
+    if n % 2 == 0:
+        return False
+
+    if n >= _TRIAL_DIVISION_LIMIT:
+        return _miller_rabin(n)
+
+    divisors = np.arange(3, int(n ** 0.5) + 1, 2, dtype=np.int64)
+    return not bool((n % divisors == 0).any())
+
+
+# F(0)..F(93) precomputed at import, covering the common small-n calls
+# (F(92) is the largest Fibonacci number that fits in a signed int64)
+_FIB = [0, 1]
+for _ in range(92):
+    _FIB.append(_FIB[-1] + _FIB[-2])
+_FIB = tuple(_FIB)
+
+
+@lru_cache(maxsize=4096)
+def _fib(n):
+    """Fibonacci via fast doubling: O(log n) big-integer multiplications.
+
+    Uses the identities F(2k) = F(k)*(2*F(k+1) - F(k)) and
+    F(2k+1) = F(k)^2 + F(k+1)^2, so cost grows with log n rather than n.
+    """
+
+    def rec(k):
+        if k == 0:
+            return 0, 1
+        a, b = rec(k >> 1)
+        c = a * ((b << 1) - a)
+        d = a * a + b * b
+        if k & 1:
+            return d, c + d
+        return c, d
+
+    return rec(n)[0]
+
+
+@lru_cache(maxsize=4096)
+def _fact(n):
+    """Memoized factorial; repeat calls for the same n are O(1) lookups."""
+    return math.factorial(n)
+
 
 @transpile_test(
     name="add",
@@ -43,13 +135,11 @@ def multiply(context, a, b):
 )
 def fibonacci(context, n):
     """Calculate the nth Fibonacci number."""
-    if n <= 1:
+    if 0 <= n <= 93:
+        return _FIB[n]
+    if n < 0:
         return n
-
-    a, b = 0, 1
-    for _ in range(2, n + 1):
-        a, b = b, a + b
-    return b
+    return _fib(n)
 
 
 @transpile_test(
@@ -87,10 +177,8 @@ def counter_get(context):
     return_type="int",
 )
 def factorial(context, n):
-    """Calculate factorial recursively."""
-    if n <= 1:
-        return 1
-    return n * factorial(context, n - 1)
+    """Calculate factorial of a number."""
+    return _fact(n) if n >= 0 else 1
 
 
 @transpile_test(
@@ -102,14 +190,4 @@ def factorial(context, n):
 )
 def is_prime(context, n):
     """Check if a number is prime."""
-    if n < 2:
-        return False
-    if n == 2:
-        return True
-    if n % 2 == 0:
-        return False
-
-    for i in range(3, int(n ** 0.5) + 1, 2):
-        if n % i == 0:
-            return False
-    return True
+    return _is_prime(n)
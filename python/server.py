@@ -9,19 +9,43 @@ This server allows executing Python functions over gRPC with support for:
 """
 
 import argparse
+import asyncio
 import importlib.util
+import inspect
 import json
 import logging
+import os
 import sys
+import threading
 import time
 import uuid
-from concurrent import futures
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import grpc
 from grpc_reflection.v1alpha import reflection
 
+# orjson (Rust/SIMD-accelerated) is preferred for the per-call JSON
+# (de)serialization; fall back to the stdlib if it is not installed
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, default=str)
+
+    _JSONDecodeError = json.JSONDecodeError
+
 # Generated proto imports (will be generated from .proto file)
 # For now, we'll add placeholder imports
 try:
@@ -32,20 +56,121 @@ except ImportError:
     sys.exit(1)
 
 
+def _encode_int_result(result) -> str:
+    return "%d" % result
+
+
+def _encode_bool_result(result) -> str:
+    return "true" if result else "false"
+
+
+# Fast-path result encoders for statically known return types; methods
+# with any other declared return type go through full JSON serialization
+_RESULT_ENCODERS = {
+    "int": _encode_int_result,
+    "bool": _encode_bool_result,
+}
+
+
+def _make_trampoline(func: Callable) -> Callable:
+    """Synthesize a specialized trampoline for a registered function.
+
+    The generated code reads the known argument names straight out of the
+    parsed argument dict, so the hot path makes one plain positional call
+    instead of rebuilding a **kwargs mapping on every invocation.
+    """
+    try:
+        params = list(inspect.signature(func).parameters)
+    except (TypeError, ValueError):
+        return lambda ctx, args: func(ctx, **args)
+
+    # The first parameter is always the execution context
+    fetches = ", ".join(f"args[{name!r}]" for name in params[1:])
+    src = f"def trampoline(ctx, args, _func=_func):\n    return _func(ctx, {fetches})"
+    namespace = {"_func": func}
+    exec(src, namespace)
+    return namespace["trampoline"]
+
+
+def _struct_value_to_py(value):
+    """Convert a google.protobuf.Value to the equivalent Python object."""
+    kind = value.WhichOneof("kind")
+    if kind == "number_value":
+        number = value.number_value
+        # Struct numbers are doubles; restore integral values to int so
+        # integer arguments behave the same as with JSON-encoded arguments
+        return int(number) if number.is_integer() else number
+    if kind == "string_value":
+        return value.string_value
+    if kind == "bool_value":
+        return value.bool_value
+    if kind == "struct_value":
+        return _struct_to_dict(value.struct_value)
+    if kind == "list_value":
+        return [_struct_value_to_py(item) for item in value.list_value.values]
+    return None
+
+
+def _struct_to_dict(struct) -> dict:
+    """Convert a google.protobuf.Struct to a plain dict of Python values."""
+    return {key: _struct_value_to_py(value) for key, value in struct.fields.items()}
+
+
+# Number of shards for the context store; must be a power of two
+_CONTEXT_SHARDS = 16
+
+# Maximum number of destroyed ExecutionContext objects kept for reuse
+_CONTEXT_POOL_SIZE = 256
+
+
+class _UUIDPool:
+    """Generates random UUIDs from a buffered os.urandom read.
+
+    uuid.uuid4() issues a urandom syscall per call; drawing 4 KiB at a time
+    and carving 16-byte slices amortizes that syscall over 256 ids.
+    """
+
+    def __init__(self, buffer_size: int = 4096):
+        self._buffer_size = buffer_size
+        self._buf = b""
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> str:
+        with self._lock:
+            if self._offset >= len(self._buf):
+                self._buf = os.urandom(self._buffer_size)
+                self._offset = 0
+            raw = self._buf[self._offset : self._offset + 16]
+            self._offset += 16
+        return str(uuid.UUID(bytes=raw, version=4))
+
+
 class ExecutionContext:
     """Manages state for stateful function execution."""
 
     def __init__(self, context_id: str, initial_state: Optional[str] = None):
         self.context_id = context_id
         self.state: Dict[str, Any] = {}
+        self._load_initial_state(initial_state)
+
+    def _load_initial_state(self, initial_state: Optional[str]):
         if initial_state:
             try:
-                self.state = json.loads(initial_state)
-            except json.JSONDecodeError:
-                logging.warning(f"Invalid initial state JSON for context {context_id}")
+                self.state.update(_json_loads(initial_state))
+            except _JSONDecodeError:
+                logging.warning(
+                    "Invalid initial state JSON for context %s", self.context_id
+                )
+
+    def reset(self, context_id: str, initial_state: Optional[str] = None):
+        """Reinitialize a pooled instance, reusing its state dict."""
+        self.context_id = context_id
+        self.state.clear()
+        self._load_initial_state(initial_state)
 
     def get_state(self) -> str:
-        return json.dumps(self.state, default=str)
+        return _json_dumps(self.state)
 
     def update_state(self, key: str, value: Any):
         self.state[key] = value
@@ -55,11 +180,37 @@ class TranspileTestServiceImpl(transpile_test_pb2_grpc.TranspileTestServiceServi
     """Implementation of the TranspileTestService."""
 
     def __init__(self):
-        self.contexts: Dict[str, ExecutionContext] = {}
+        # Contexts are sharded by id hash, each shard guarded by its own
+        # lock, so the gRPC worker threads do not contend on a single dict
+        self._context_shards = [({}, threading.Lock()) for _ in range(_CONTEXT_SHARDS)]
         self.methods: Dict[str, Callable] = {}
         self.method_metadata: Dict[str, dict] = {}
+        # Fused dispatch table: one lookup yields
+        # (trampoline, is_stateful, encode_result)
+        self._dispatch: Dict[str, Tuple[Callable, bool, Callable]] = {}
+        # Execution timing + metadata protos are only produced when debug
+        # logging is on; for trivial methods they dominate the call cost
+        self._debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+        # Template for per-call metadata; only execution_time_us varies,
+        # so constant fields are walked once here instead of per call
+        self._metadata_template = transpile_test_pb2.ExecutionMetadata(
+            memory_bytes=0,  # TODO: Implement memory tracking
+            runtime="python",
+        )
+        self._uuid_pool = _UUIDPool()
+        # Free list of destroyed contexts; create/destroy-heavy workloads
+        # reuse these instead of churning the allocator
+        self._ctx_pool: list = []
+        # Serialized ListMethods responses keyed by prefix; the method set
+        # only changes on registration, so repeat listings skip the
+        # MethodInfo rebuild entirely
+        self._list_methods_cache: Dict[str, bytes] = {}
         logging.info("Python gRPC server initialized")
 
+    def _context_shard(self, context_id: str):
+        """Return the (contexts, lock) shard owning the given context id."""
+        return self._context_shards[hash(context_id) & (_CONTEXT_SHARDS - 1)]
+
     def register_function(
         self,
         name: str,
@@ -70,140 +221,182 @@ class TranspileTestServiceImpl(transpile_test_pb2_grpc.TranspileTestServiceServi
         return_type: str = "Any",
     ):
         """Register a function that can be invoked via gRPC."""
+        # Interned keys let hot-path dict lookups short-circuit on
+        # pointer identity instead of comparing string contents
+        name = sys.intern(name)
         self.methods[name] = func
+        self._dispatch[name] = (
+            _make_trampoline(func),
+            is_stateful,
+            _RESULT_ENCODERS.get(return_type, _json_dumps),
+        )
+        self._list_methods_cache.clear()
         self.method_metadata[name] = {
             "description": description,
             "is_stateful": is_stateful,
             "parameter_types": parameter_types or [],
             "return_type": return_type,
         }
-        logging.info(f"Registered function: {name}")
+        logging.info("Registered function: %s", name)
 
     def load_module(self, module_path: str):
         """Dynamically load a Python module and register its functions."""
         path = Path(module_path)
         if not path.exists():
-            logging.error(f"Module not found: {module_path}")
+            logging.error("Module not found: %s", module_path)
             return
 
         spec = importlib.util.spec_from_file_location("dynamic_module", path)
         if spec and spec.loader:
             module = importlib.util.module_from_spec(spec)
+            registry_start = len(_REGISTRY)
             spec.loader.exec_module(module)
 
-            # Auto-register functions with __transpile_test__ marker
+            # Reset any memoized helpers (functools.lru_cache etc.) so a
+            # reloaded module does not serve results cached by a previous load
             for name in dir(module):
                 obj = getattr(module, name)
-                if callable(obj) and hasattr(obj, "__transpile_test__"):
-                    metadata = obj.__transpile_test__
-                    self.register_function(
-                        name=metadata.get("name", name),
-                        func=obj,
-                        description=metadata.get("description", ""),
-                        is_stateful=metadata.get("is_stateful", False),
-                        parameter_types=metadata.get("parameter_types", []),
-                        return_type=metadata.get("return_type", "Any"),
-                    )
-            logging.info(f"Loaded module: {module_path}")
+                if callable(obj) and hasattr(obj, "cache_clear"):
+                    obj.cache_clear()
+
+            # Functions the decorator recorded while the module executed
+            entries = _REGISTRY[registry_start:]
+            if not entries:
+                # The module may have imported a separate copy of this file
+                # (e.g. server.py running as __main__ while the module does
+                # "from server import transpile_test"), in which case its
+                # decorations landed in that copy's registry; fall back to
+                # scanning for the marker attribute
+                for name in dir(module):
+                    obj = getattr(module, name)
+                    if callable(obj) and hasattr(obj, "__transpile_test__"):
+                        metadata = obj.__transpile_test__
+                        entries.append((metadata.get("name", name), obj, metadata))
+
+            for name, func, metadata in entries:
+                self.register_function(
+                    name=name,
+                    func=func,
+                    description=metadata.get("description", ""),
+                    is_stateful=metadata.get("is_stateful", False),
+                    parameter_types=metadata.get("parameter_types", []),
+                    return_type=metadata.get("return_type", "Any"),
+                )
+            logging.info("Loaded module: %s", module_path)
 
-    def CreateContext(self, request, context):
+    async def CreateContext(self, request, context):
         """Create a new execution context."""
-        context_id = str(uuid.uuid4())
-        exec_context = ExecutionContext(context_id, request.initial_state)
-        self.contexts[context_id] = exec_context
+        context_id = self._uuid_pool.next()
+        if self._ctx_pool:
+            exec_context = self._ctx_pool.pop()
+            exec_context.reset(context_id, request.initial_state)
+        else:
+            exec_context = ExecutionContext(context_id, request.initial_state)
+        contexts, lock = self._context_shard(context_id)
+        with lock:
+            contexts[context_id] = exec_context
 
-        logging.info(f"Created context: {context_id}")
+        logging.info("Created context: %s", context_id)
         return transpile_test_pb2.CreateContextResponse(
             context_id=context_id, success=True, error=""
         )
 
-    def InvokeMethod(self, request, context):
+    async def InvokeMethod(self, request, context):
         """Invoke a registered method."""
-        start_time = time.perf_counter()
+        debug = self._debug_enabled
+        start_time = time.perf_counter() if debug else 0.0
 
         try:
             # Get the function
-            if request.method_name not in self.methods:
+            method_name = sys.intern(request.method_name)
+            entry = self._dispatch.get(method_name)
+            if entry is None:
                 return transpile_test_pb2.InvokeMethodResponse(
                     success=False,
-                    error=f"Method not found: {request.method_name}",
+                    error=f"Method not found: {method_name}",
                 )
 
-            func = self.methods[request.method_name]
+            trampoline, is_stateful, encode_result = entry
 
-            # Parse arguments
-            try:
-                args = json.loads(request.arguments) if request.arguments else {}
-            except json.JSONDecodeError as e:
-                return transpile_test_pb2.InvokeMethodResponse(
-                    success=False, error=f"Invalid JSON arguments: {e}"
-                )
+            # Arguments arrive as a proto Struct, already decoded by gRPC
+            args = _struct_to_dict(request.arguments)
 
             # Get context if needed
             exec_context = None
             if request.context_id:
-                if request.context_id not in self.contexts:
+                contexts, lock = self._context_shard(request.context_id)
+                with lock:
+                    exec_context = contexts.get(request.context_id)
+                if exec_context is None:
                     return transpile_test_pb2.InvokeMethodResponse(
                         success=False, error=f"Context not found: {request.context_id}"
                     )
-                exec_context = self.contexts[request.context_id]
-
-            # Execute function
-            if exec_context and self.method_metadata[request.method_name]["is_stateful"]:
-                # Pass context to stateful functions
-                result = func(exec_context, **args)
-            else:
-                # Call stateless functions normally
-                result = func(**args)
-
-            # Calculate execution time
-            execution_time_us = int((time.perf_counter() - start_time) * 1_000_000)
-
-            # Serialize result
-            result_json = json.dumps(result, default=str)
-
-            metadata = transpile_test_pb2.ExecutionMetadata(
-                execution_time_us=execution_time_us,
-                memory_bytes=0,  # TODO: Implement memory tracking
-                runtime="python",
-            )
 
-            logging.debug(f"Executed {request.method_name} in {execution_time_us}us")
+            # Execute function; the trampoline forwards arguments positionally
+            # (exec_context is None for stateless calls)
+            result = trampoline(exec_context, args)
+
+            # Serialize result via the method's precomputed encoder
+            result_json = encode_result(result)
+
+            if debug:
+                execution_time_us = int((time.perf_counter() - start_time) * 1_000_000)
+                metadata = transpile_test_pb2.ExecutionMetadata()
+                metadata.CopyFrom(self._metadata_template)
+                metadata.execution_time_us = execution_time_us
+                logging.debug("Executed %s in %dus", method_name, execution_time_us)
+                return transpile_test_pb2.InvokeMethodResponse(
+                    success=True, result=result_json, error="", metadata=metadata
+                )
+
             return transpile_test_pb2.InvokeMethodResponse(
-                success=True, result=result_json, error="", metadata=metadata
+                success=True, result=result_json, error=""
             )
 
         except Exception as e:
-            logging.error(f"Error executing {request.method_name}: {e}", exc_info=True)
+            logging.error("Error executing %s: %s", request.method_name, e, exc_info=True)
             return transpile_test_pb2.InvokeMethodResponse(
                 success=False, error=str(e)
             )
 
-    def InspectState(self, request, context):
+    async def InspectState(self, request, context):
         """Inspect the state of a context."""
-        if request.context_id not in self.contexts:
+        contexts, lock = self._context_shard(request.context_id)
+        with lock:
+            exec_context = contexts.get(request.context_id)
+        if exec_context is None:
             return transpile_test_pb2.InspectStateResponse(
                 success=False, error=f"Context not found: {request.context_id}"
             )
 
-        exec_context = self.contexts[request.context_id]
         return transpile_test_pb2.InspectStateResponse(
             success=True, state=exec_context.get_state(), error=""
         )
 
-    def DestroyContext(self, request, context):
+    async def DestroyContext(self, request, context):
         """Destroy an execution context."""
-        if request.context_id in self.contexts:
-            del self.contexts[request.context_id]
-            logging.info(f"Destroyed context: {request.context_id}")
+        contexts, lock = self._context_shard(request.context_id)
+        with lock:
+            removed = contexts.pop(request.context_id, None)
+
+        if removed is not None:
+            if len(self._ctx_pool) < _CONTEXT_POOL_SIZE:
+                # Drop state references now and keep the object for reuse
+                removed.state.clear()
+                self._ctx_pool.append(removed)
+            logging.info("Destroyed context: %s", request.context_id)
             return transpile_test_pb2.DestroyContextResponse(success=True, error="")
         else:
             return transpile_test_pb2.DestroyContextResponse(
                 success=False, error=f"Context not found: {request.context_id}"
             )
 
-    def ListMethods(self, request, context):
+    async def ListMethods(self, request, context):
         """List available methods."""
+        cached = self._list_methods_cache.get(request.prefix)
+        if cached is not None:
+            return transpile_test_pb2.ListMethodsResponse.FromString(cached)
+
         methods = []
         for name, metadata in self.method_metadata.items():
             if request.prefix and not name.startswith(request.prefix):
@@ -218,7 +411,14 @@ class TranspileTestServiceImpl(transpile_test_pb2_grpc.TranspileTestServiceServi
             )
             methods.append(method_info)
 
-        return transpile_test_pb2.ListMethodsResponse(methods=methods)
+        response = transpile_test_pb2.ListMethodsResponse(methods=methods)
+        self._list_methods_cache[request.prefix] = response.SerializeToString()
+        return response
+
+
+# Functions recorded by the @transpile_test decorator, in decoration order;
+# load_module consumes this instead of scanning every module attribute
+_REGISTRY: List[Tuple[str, Callable, dict]] = []
 
 
 def transpile_test(**metadata):
@@ -226,14 +426,29 @@ def transpile_test(**metadata):
 
     def decorator(func):
         func.__transpile_test__ = metadata
+        _REGISTRY.append((metadata.get("name", func.__name__), func, metadata))
         return func
 
     return decorator
 
 
-def serve(port: int, module_path: Optional[str] = None):
+async def serve(port: int, module_path: Optional[str] = None):
     """Start the gRPC server."""
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    # Tuned for sustained small-message load: keep connections alive,
+    # raise the HTTP/2 stream cap well past the default 100, and let the
+    # kernel balance across processes sharing the port
+    options = [
+        ("grpc.keepalive_time_ms", 30000),
+        ("grpc.keepalive_timeout_ms", 10000),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        ("grpc.max_concurrent_streams", 10000),
+        ("grpc.so_reuseport", 1),
+    ]
+
+    # One event loop services all RPCs cooperatively; no thread-pool
+    # dispatch or per-call thread wakeup, and no 10-worker concurrency cap
+    server = grpc.aio.server(options=options)
     service = TranspileTestServiceImpl()
 
     if module_path:
@@ -249,16 +464,12 @@ def serve(port: int, module_path: Optional[str] = None):
     reflection.enable_server_reflection(SERVICE_NAMES, server)
 
     server.add_insecure_port(f"[::]:{port}")
-    server.start()
+    await server.start()
 
-    logging.info(f"Python gRPC server started on port {port}")
+    logging.info("Python gRPC server started on port %d", port)
     print(f"Python gRPC server listening on port {port}")
 
-    try:
-        server.wait_for_termination()
-    except KeyboardInterrupt:
-        logging.info("Shutting down server...")
-        server.stop(0)
+    await server.wait_for_termination()
 
 
 def main():
@@ -274,7 +485,10 @@ def main():
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
-    serve(args.port, args.module)
+    try:
+        asyncio.run(serve(args.port, args.module))
+    except KeyboardInterrupt:
+        logging.info("Shutting down server...")
 
 
 if __name__ == "__main__":
@@ -29,6 +29,40 @@ use transpile_test::*;
 
 mod examples;
 
+/// Convert a proto Struct (as delivered by gRPC) into a JSON object
+fn struct_to_json(value: prost_types::Struct) -> JsonValue {
+    JsonValue::Object(
+        value
+            .fields
+            .into_iter()
+            .map(|(key, value)| (key, proto_value_to_json(value)))
+            .collect(),
+    )
+}
+
+fn proto_value_to_json(value: prost_types::Value) -> JsonValue {
+    use prost_types::value::Kind;
+
+    match value.kind {
+        None | Some(Kind::NullValue(_)) => JsonValue::Null,
+        Some(Kind::NumberValue(n)) => {
+            // Struct numbers are doubles; restore integral values to i64 so
+            // integer arguments behave the same as JSON-encoded arguments
+            if n.fract() == 0.0 && n.abs() <= 9_007_199_254_740_992.0 {
+                JsonValue::from(n as i64)
+            } else {
+                JsonValue::from(n)
+            }
+        }
+        Some(Kind::StringValue(s)) => JsonValue::String(s),
+        Some(Kind::BoolValue(b)) => JsonValue::Bool(b),
+        Some(Kind::StructValue(s)) => struct_to_json(s),
+        Some(Kind::ListValue(list)) => {
+            JsonValue::Array(list.values.into_iter().map(proto_value_to_json).collect())
+        }
+    }
+}
+
 /// Type alias for registered functions
 type RegisteredFunction =
     Arc<dyn Fn(&ExecutionContext, JsonValue) -> Result<JsonValue, String> + Send + Sync>;
@@ -180,18 +214,11 @@ impl TranspileTestService for TranspileTestServer {
             }
         };
 
-        // Parse arguments
-        let args: JsonValue = match serde_json::from_str(&req.arguments) {
-            Ok(v) => v,
-            Err(e) => {
-                return Ok(Response::new(InvokeMethodResponse {
-                    success: false,
-                    result: String::new(),
-                    error: format!("Invalid JSON arguments: {}", e),
-                    metadata: None,
-                }));
-            }
-        };
+        // Arguments arrive as a proto Struct, already decoded by gRPC
+        let args = req
+            .arguments
+            .map(struct_to_json)
+            .unwrap_or_else(|| JsonValue::Object(Default::default()));
 
         // Get or create context
         let context = if req.context_id.is_empty() {
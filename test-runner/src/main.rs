@@ -22,6 +22,34 @@ pub mod transpile_test {
 use transpile_test::transpile_test_service_client::TranspileTestServiceClient;
 use transpile_test::*;
 
+/// Convert test-case JSON arguments to the proto Struct the service expects
+fn json_to_proto_struct(value: &serde_json::Value) -> prost_types::Struct {
+    let fields = match value {
+        serde_json::Value::Object(map) => map
+            .iter()
+            .map(|(key, value)| (key.clone(), json_to_proto_value(value)))
+            .collect(),
+        _ => Default::default(),
+    };
+    prost_types::Struct { fields }
+}
+
+fn json_to_proto_value(value: &serde_json::Value) -> prost_types::Value {
+    use prost_types::value::Kind;
+
+    let kind = match value {
+        serde_json::Value::Null => Kind::NullValue(0),
+        serde_json::Value::Bool(b) => Kind::BoolValue(*b),
+        serde_json::Value::Number(n) => Kind::NumberValue(n.as_f64().unwrap_or(0.0)),
+        serde_json::Value::String(s) => Kind::StringValue(s.clone()),
+        serde_json::Value::Array(items) => Kind::ListValue(prost_types::ListValue {
+            values: items.iter().map(json_to_proto_value).collect(),
+        }),
+        serde_json::Value::Object(_) => Kind::StructValue(json_to_proto_struct(value)),
+    };
+    prost_types::Value { kind: Some(kind) }
+}
+
 #[derive(Debug, Deserialize, Serialize)]
 struct TestSuite {
     name: String,
@@ -97,14 +125,14 @@ impl TestRunner {
     async fn run_test(&mut self, test: &TestCase) -> Result<TestResult> {
         info!("Running test: {}", test.name);
 
-        let args_json = serde_json::to_string(&test.arguments)?;
+        let args = json_to_proto_struct(&test.arguments);
 
         // Run test on Python
         let (python_result, python_error, python_time) =
-            self.execute_on_python(test, &args_json).await;
+            self.execute_on_python(test, &args).await;
 
         // Run test on Rust
-        let (rust_result, rust_error, rust_time) = self.execute_on_rust(test, &args_json).await;
+        let (rust_result, rust_error, rust_time) = self.execute_on_rust(test, &args).await;
 
         // Compare results
         let (passed, error_message) = self.compare_results(
@@ -131,7 +159,7 @@ impl TestRunner {
     async fn execute_on_python(
         &mut self,
         test: &TestCase,
-        args_json: &str,
+        args: &prost_types::Struct,
     ) -> (Option<serde_json::Value>, Option<String>, Option<i64>) {
         let context_id = if test.stateful {
             match self
@@ -158,7 +186,7 @@ impl TestRunner {
         let request = InvokeMethodRequest {
             context_id: context_id.clone().unwrap_or_default(),
             method_name: test.method.clone(),
-            arguments: args_json.to_string(),
+            arguments: Some(args.clone()),
         };
 
         let result = match self.python_client.invoke_method(request).await {
@@ -190,7 +218,7 @@ impl TestRunner {
     async fn execute_on_rust(
         &mut self,
         test: &TestCase,
-        args_json: &str,
+        args: &prost_types::Struct,
     ) -> (Option<serde_json::Value>, Option<String>, Option<i64>) {
         let context_id = if test.stateful {
             match self
@@ -217,7 +245,7 @@ impl TestRunner {
         let request = InvokeMethodRequest {
             context_id: context_id.clone().unwrap_or_default(),
             method_name: test.method.clone(),
-            arguments: args_json.to_string(),
+            arguments: Some(args.clone()),
         };
 
         let result = match self.rust_client.invoke_method(request).await {